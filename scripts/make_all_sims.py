@@ -7,7 +7,6 @@ import time
 import requests
 from dotenv import load_dotenv
 from mutare_tools.exec import SimsConfig, create_sim_jobs, exec_sim_jobs
-from mutare_tools.plots.core import plot_sim_jobs
 from sims_configs import SIMS_CONFIGS, SIMS_DIR
 
 
@@ -49,6 +48,8 @@ def make_sims(sims_config: SimsConfig, plots_only: bool, notify: bool) -> None:
     if not plots_only:
         exec_sim_jobs(sim_jobs)
 
+    from mutare_tools.plots.core import plot_sim_jobs
+
     plot_sim_jobs(sim_jobs)
 
     log(f"'{base_dir.name}' simulations finished", notify)
@@ -1,5 +1,6 @@
 #!/home/marcomc/Documents/Doctorado/mutare/.venv/bin/python3
 
+import os
 import subprocess
 import time
 from dataclasses import dataclass
@@ -9,7 +10,7 @@ from signal import SIGUSR1
 from typing import ClassVar
 
 import psutil
-from mutare_tools.exec import create_sim_jobs
+from mutare_tools.exec import create_sim_jobs, output_file_name, run_dir_name
 from sims_configs import SIMS_CONFIGS, SIMS_DIR
 from textual import on, work
 from textual.app import App, ComposeResult
@@ -56,7 +57,7 @@ def scan_sims_dir() -> ProgressInfo:
         dir: Path, expected_dir_entry_names: set[str]
     ) -> set[str]:
         dir_entry_names = (
-            {path.name for path in dir.iterdir()} if dir.is_dir() else set()
+            {entry.name for entry in os.scandir(dir)} if dir.is_dir() else set()
         )
         progress_info.extra_entries |= {
             dir / entry_name
@@ -80,10 +81,10 @@ def scan_sims_dir() -> ProgressInfo:
 
         sim_dir_names = {sim_dir.name for sim_dir in sim_dirs}
         expected_base_dir_entry_names = sim_dir_names | {"plots"}
-        run_dir_names = {f"run-{run_idx:04}" for run_idx in range(n_runs)}
+        run_dir_names = {run_dir_name(run_idx) for run_idx in range(n_runs)}
         expected_sim_dir_entry_names = run_dir_names | {"config.toml"}
         expected_run_dir_entry_names = {
-            f"output-{file_idx:04}.msgpack" for file_idx in range(n_files)
+            output_file_name(file_idx) for file_idx in range(n_files)
         } | {"checkpoint.msgpack", "analysis.msgpack", ".lock", "output.log"}
 
         progress_info.n_expected_msgpacks += len(sim_dirs) * n_runs * (n_files + 2)
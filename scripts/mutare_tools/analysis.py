@@ -1,4 +1,7 @@
+import mmap
+import warnings
 from enum import IntEnum, auto
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
@@ -6,7 +9,7 @@ import msgpack
 import numpy as np
 import pandas as pd
 
-from .exec import SimJob, print_process_msg
+from .exec import SimJob, output_file_name, print_process_msg, run_dir_name
 
 OBSERVABLES = [
     "time",
@@ -23,6 +26,12 @@ SCALAR_OBSERVABLES = [
     obs for obs in OBSERVABLES if obs not in {"avg_strat_phe", "dist_phe"}
 ]
 
+SCALAR_OBS_GETTER = itemgetter(*[OBSERVABLES.index(obs) for obs in SCALAR_OBSERVABLES])
+AVG_STRAT_PHE_IDX = OBSERVABLES.index("avg_strat_phe")
+DIST_PHE_IDX = OBSERVABLES.index("dist_phe")
+
+TIME_SERIES_COLUMNS = SCALAR_OBSERVABLES + ["avg_strat_phe_0", "dist_phe_0"]
+
 ANALYSIS = [
     "dist_n_agents",
     "avg_growth_rate",
@@ -43,20 +52,23 @@ class SimType(IntEnum):
     RANDOM = auto()
 
 
-def add_sim_info(df_or_dict: pd.DataFrame | dict[str, Any], sim_job: SimJob) -> None:
-    df_or_dict["prob_mut"] = sim_job.config["model"]["prob_mut"]
-    df_or_dict["std_dev_mut"] = sim_job.config["model"].get("std_dev_mut")
-    df_or_dict["n_agents_i"] = sim_job.config["init"]["n_agents"]
+def add_sim_info(df: pd.DataFrame, sim_job: SimJob) -> None:
+    model = sim_job.config.model
+    init = sim_job.config.init
+    prob_mut = model.prob_mut
+    strat_phe_i = init.strat_phe
 
-    strat_phe_i = sim_job.config["init"].get("strat_phe")
+    df["prob_mut"] = prob_mut
+    df["std_dev_mut"] = model.std_dev_mut
+    df["n_agents_i"] = init.n_agents
     if strat_phe_i is not None:
-        df_or_dict["strat_phe_0_i"] = strat_phe_i[0]
-        if sim_job.config["model"]["prob_mut"] == 0.0:
-            df_or_dict["sim_type"] = SimType.FIXED
+        df["strat_phe_0_i"] = strat_phe_i[0]
+        if prob_mut == 0.0:
+            df["sim_type"] = SimType.FIXED
         else:
-            df_or_dict["sim_type"] = SimType.EVOL
+            df["sim_type"] = SimType.EVOL
     else:
-        df_or_dict["sim_type"] = SimType.RANDOM
+        df["sim_type"] = SimType.RANDOM
 
 
 def collect_run_time_series(sim_job: SimJob, run_idx: int) -> pd.DataFrame:
@@ -64,85 +76,100 @@ def collect_run_time_series(sim_job: SimJob, run_idx: int) -> pd.DataFrame:
     n_rows = 0
     MAX_ROWS = 4_096
 
-    for file_idx in range(sim_job.n_files):
-        file_path = (
-            sim_job.sim_dir / f"run-{run_idx:04}" / f"output-{file_idx:04}.msgpack"
-        )
-        with file_path.open("rb") as file:
-            output = msgpack.Unpacker(file)
+    run_dir = sim_job.sim_dir / run_dir_name(run_idx)
+    file_paths = [
+        run_dir / output_file_name(file_idx) for file_idx in range(sim_job.n_files)
+    ]
+
+    for file_path in file_paths:
+        if file_path.stat().st_size == 0:
+            continue
+
+        with (
+            file_path.open("rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as file_map,
+        ):
+            output = msgpack.Unpacker(file_map, use_list=False)
             for message in output:
                 if n_rows >= MAX_ROWS:
                     break
 
-                obs = {key: message[idx] for idx, key in enumerate(OBSERVABLES)}
-                row = {key: obs.get(key) for key in SCALAR_OBSERVABLES}
-                row.update({"avg_strat_phe_0": obs["avg_strat_phe"][0]})
-                row.update({"dist_phe_0": obs["dist_phe"][0]})
-                add_sim_info(row, sim_job)
+                row = SCALAR_OBS_GETTER(message) + (
+                    message[AVG_STRAT_PHE_IDX][0],
+                    message[DIST_PHE_IDX][0],
+                )
                 run_time_series.append(row)
                 n_rows += 1
 
+    run_time_series = pd.DataFrame(run_time_series, columns=TIME_SERIES_COLUMNS)
+    add_sim_info(run_time_series, sim_job)
+
     print_process_msg("collected 'run_time_series'")
 
-    return pd.DataFrame(run_time_series)
+    return run_time_series
 
 
 def read_analysis(sim_dir: Path, run_idx: int) -> dict[str, Any]:
-    file_path = sim_dir / f"run-{run_idx:04}" / "analysis.msgpack"
+    file_path = sim_dir / run_dir_name(run_idx) / "analysis.msgpack"
     with file_path.open("rb") as file:
         message: Any = msgpack.unpack(file)
     return {key: message[idx] for idx, key in enumerate(ANALYSIS)}
 
 
+def flatten_analysis(analysis: dict[str, Any], tau_idx_max: int) -> dict[str, float]:
+    flat_analysis = {
+        key: value for key, value in analysis.items() if not isinstance(value, list)
+    }
+    for bin, ele in enumerate(analysis["dist_n_agents"]):
+        flat_analysis[f"dist_n_agents_{bin}"] = ele
+    flat_analysis["avg_avg_strat_phe_0"] = analysis["avg_avg_strat_phe"][0]
+    for bin, ele in enumerate(analysis["dist_avg_strat_phe"][0]):
+        flat_analysis[f"dist_avg_strat_phe_0_{bin}"] = ele
+    flat_analysis["avg_dist_phe_0"] = analysis["avg_dist_phe"][0]
+    for tau_idx, ele in enumerate(analysis["tau_avg_strat_phe"][0][:tau_idx_max]):
+        flat_analysis[f"tau_{tau_idx}"] = ele[0]
+        flat_analysis[f"tau_avg_strat_phe_0_{tau_idx}"] = ele[1]
+    return flat_analysis
+
+
 def collect_avg_analyses(sim_jobs: list[SimJob]) -> pd.DataFrame:
     avg_analyses = []
     for sim_job in sim_jobs:
-        analyses = []
-        tau_idx_max = np.inf
-        for run_idx in range(sim_job.n_runs):
-            analysis = read_analysis(sim_job.sim_dir, run_idx)
-            for bin, ele in enumerate(analysis["dist_n_agents"]):
-                analysis[f"dist_n_agents_{bin}"] = ele
-            analysis.pop("dist_n_agents")
-            analysis["avg_avg_strat_phe_0"] = analysis["avg_avg_strat_phe"][0]
-            analysis.pop("avg_avg_strat_phe")
-            for bin, ele in enumerate(analysis["dist_avg_strat_phe"][0]):
-                analysis[f"dist_avg_strat_phe_0_{bin}"] = ele
-            analysis.pop("dist_avg_strat_phe")
-            analysis["avg_dist_phe_0"] = analysis["avg_dist_phe"][0]
-            analysis.pop("avg_dist_phe")
-            tau_idx_max = min(tau_idx_max, len(analysis["tau_avg_strat_phe"][0]))
-            for tau_idx, ele in enumerate(analysis["tau_avg_strat_phe"][0]):
-                analysis[f"tau_{tau_idx}"] = ele[0]
-                analysis[f"tau_avg_strat_phe_0_{tau_idx}"] = ele[1]
-            analysis.pop("tau_avg_strat_phe")
-            analysis = pd.DataFrame(analysis, index=[run_idx])
-
-            analyses.append(analysis)
-
-        analyses = pd.DataFrame(pd.concat(analyses))
-        analyses = analyses.drop(
-            columns=[
-                column
-                for column in analyses.columns
-                if (column.startswith(("tau_", "tau_avg_strat_phe_0_")))
-                and int(column.rsplit("_", 1)[1]) >= tau_idx_max
-            ]
+        analyses = [
+            read_analysis(sim_job.sim_dir, run_idx) for run_idx in range(sim_job.n_runs)
+        ]
+        tau_idx_max = min(
+            len(analysis["tau_avg_strat_phe"][0]) for analysis in analyses
         )
 
-        avg_analysis = []
-        for column in analyses.columns:
-            avg_analysis.append(analyses[column].mean())
-            avg_analysis.append(analyses[column].sem())
-        avg_analysis = pd.DataFrame([avg_analysis])
-        avg_analysis.columns = pd.MultiIndex.from_product(
-            [analyses.columns, ["mean", "sem"]]
+        flat_analyses = [
+            flatten_analysis(analysis, tau_idx_max) for analysis in analyses
+        ]
+        columns = list(flat_analyses[0])
+        values = np.empty((len(flat_analyses), len(columns)))
+        for run_idx, flat_analysis in enumerate(flat_analyses):
+            values[run_idx] = list(flat_analysis.values())
+
+        n_values = np.count_nonzero(~np.isnan(values), axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            means = np.nanmean(values, axis=0)
+            sems = np.nanstd(values, axis=0, ddof=1) / np.sqrt(n_values)
+
+        stats = pd.DataFrame(
+            [means, sems],
+            index=["mean", "sem"],
+            columns=columns,
         )
+        avg_analysis = stats.unstack().to_frame().T
 
         add_sim_info(avg_analysis, sim_job)
 
         avg_analyses.append(avg_analysis)
 
+    avg_analyses = pd.concat(avg_analyses, ignore_index=True)
+    avg_analyses.attrs["hist_bins"] = sim_jobs[0].config.output.hist_bins
+
     print_process_msg("collected 'avg_analyses'")
 
-    return pd.concat(avg_analyses, ignore_index=True)
+    return avg_analyses
@@ -1,37 +1,58 @@
 import hashlib
 import json
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import NotRequired, TypedDict, cast
+from typing import Any
 
 import toml
 
 
-class ModelParams(TypedDict):
+@dataclass(slots=True, frozen=True)
+class ModelParams:
     n_env: int
     n_phe: int
     rates_trans: list[list[float]]
     rates_birth: list[list[float]]
     rates_death: list[list[float]]
     prob_mut: float
-    std_dev_mut: NotRequired[float]
+    std_dev_mut: float | None = None
 
 
-class InitParams(TypedDict):
+@dataclass(slots=True, frozen=True)
+class InitParams:
     n_agents: int
-    strat_phe: NotRequired[list[float]]
+    strat_phe: list[float] | None = None
 
 
-class OutputParams(TypedDict):
+@dataclass(slots=True, frozen=True)
+class OutputParams:
     file_steps_factor: int
     save_steps_factor: int
     hist_bins: int
 
 
-class Config(TypedDict):
+@dataclass(slots=True, frozen=True)
+class Config:
     model: ModelParams
     init: InitParams
     output: OutputParams
 
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(
+            self,
+            dict_factory=lambda items: {
+                key: value for key, value in items if value is not None
+            },
+        )
+
+    @classmethod
+    def from_dict(cls, config_dict: dict[str, Any]) -> "Config":
+        return cls(
+            model=ModelParams(**config_dict["model"]),
+            init=InitParams(**config_dict["init"]),
+            output=OutputParams(**config_dict["output"]),
+        )
+
 
 def config_file_path(sim_dir: Path) -> Path:
     return sim_dir / "config.toml"
@@ -39,17 +60,17 @@ def config_file_path(sim_dir: Path) -> Path:
 
 def save_config(config: Config, sim_dir: Path) -> None:
     with config_file_path(sim_dir).open("w") as file:
-        toml.dump(config, file)
+        toml.dump(config.to_dict(), file)
 
 
 def load_config(sim_dir: Path) -> Config:
     with config_file_path(sim_dir).open("r") as file:
-        config = toml.load(file)
-    return cast(Config, config)
+        config_dict = toml.load(file)
+    return Config.from_dict(config_dict)
 
 
 def hash_sim_dir(base_dir: Path, config: Config) -> Path:
-    config_str = json.dumps(config, sort_keys=True)
+    config_str = json.dumps(config.to_dict(), sort_keys=True)
     config_hash = hashlib.sha256(config_str.encode()).hexdigest()
 
     sim_dir = base_dir / config_hash
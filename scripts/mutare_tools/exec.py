@@ -2,13 +2,16 @@ import fcntl
 import multiprocessing as mp
 import os
 import subprocess
-from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum, auto
+from functools import cache
+from multiprocessing.sharedctypes import Synchronized
+from multiprocessing.synchronize import Event
 from pathlib import Path
 from signal import SIGUSR1, signal
 from types import FrameType
+from typing import TextIO, cast
 
 import psutil
 
@@ -16,6 +19,9 @@ from .config import Config, hash_sim_dir
 
 N_CORES = psutil.cpu_count(logical=False)
 
+MP_CONTEXT = mp.get_context("forkserver")
+MP_CONTEXT.set_forkserver_preload([__name__])
+
 
 def print_process_msg(message: str) -> None:
     timestamp = datetime.now().astimezone().isoformat(timespec="seconds")
@@ -26,24 +32,79 @@ class PauseRequested(Exception):
     pass
 
 
-pause_requested = False
+pause_event: Event | None = None
 
 
 def request_pause(signum: int, _: FrameType | None) -> None:
     print_process_msg(f"received signal {signum}: requesting pause")
 
-    global pause_requested
-    pause_requested = True
+    if pause_event is not None:
+        pause_event.set()
 
 
 def set_signal_handler():
     print_process_msg("setting signal handler")
+
+    global pause_event
+    if pause_event is None:
+        pause_event = MP_CONTEXT.Event()
+
     signal(SIGUSR1, request_pause)
 
 
+@cache
 def build_bin():
     print_process_msg("building binary")
-    subprocess.run(["cargo", "build", "--release"], check=True, capture_output=True)
+    build = subprocess.run(
+        ["cargo", "build", "--release"],
+        check=False,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if build.returncode != 0:
+        print(build.stderr, flush=True)
+        build.check_returncode()
+
+
+def physical_core_cpus() -> list[set[int]]:
+    if not hasattr(os, "sched_getaffinity"):
+        return []
+
+    core_cpus: dict[str, set[int]] = {}
+    for cpu in sorted(os.sched_getaffinity(0)):
+        topology_dir = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology")
+        try:
+            siblings = (topology_dir / "thread_siblings_list").read_text().strip()
+        except OSError:
+            siblings = str(cpu)
+        core_cpus.setdefault(siblings, set()).add(cpu)
+    return list(core_cpus.values())
+
+
+def init_worker(
+    shared_pause_event: Event | None,
+    worker_counter: Synchronized,
+    core_cpus: list[set[int]],
+) -> None:
+    global pause_event
+    pause_event = shared_pause_event
+
+    with worker_counter.get_lock():
+        worker_idx = worker_counter.value
+        worker_counter.value += 1
+    if hasattr(os, "sched_setaffinity") and core_cpus:
+        os.sched_setaffinity(0, core_cpus[worker_idx % len(core_cpus)])
+
+
+@cache
+def run_dir_name(run_idx: int) -> str:
+    return f"run-{run_idx:04}"
+
+
+@cache
+def output_file_name(file_idx: int) -> str:
+    return f"output-{file_idx:04}.msgpack"
 
 
 @dataclass
@@ -54,7 +115,7 @@ class SimRun:
 
     @property
     def run_dir(self) -> Path:
-        run_dir = self.sim_dir / f"run-{self.run_idx:04}"
+        run_dir = self.sim_dir / run_dir_name(self.run_idx)
         run_dir.mkdir(parents=True, exist_ok=True)
         return run_dir
 
@@ -65,19 +126,31 @@ class RunResult(Enum):
     FAILED = auto()
 
 
-def exec_bin(sim_run: SimRun, sim_cmd: str) -> None:
-    if pause_requested:
-        raise PauseRequested()
-
+def start_bin(sim_run: SimRun, output_file: TextIO) -> subprocess.Popen[str]:
     project_root = Path(__file__).resolve().parents[2]
     binary = str(project_root / "target" / "release" / "mutare")
 
     sim_dir = str(sim_run.sim_dir)
     run_idx = str(sim_run.run_idx)
-    run_dir = sim_run.run_dir
-    with open(run_dir / "output.log", "w", buffering=1) as output_file:
-        args = [binary, "--sim-dir", sim_dir, "--run-idx", run_idx, sim_cmd]
-        subprocess.run(args, stdout=output_file, stderr=subprocess.STDOUT, check=True)
+    args = [binary, "--sim-dir", sim_dir, "--run-idx", run_idx, "serve"]
+    return subprocess.Popen(
+        args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=output_file,
+        text=True,
+    )
+
+
+def exec_bin(server: subprocess.Popen[str], sim_cmd: str) -> None:
+    if pause_event is not None and pause_event.is_set():
+        raise PauseRequested()
+
+    stdin, stdout = cast(TextIO, server.stdin), cast(TextIO, server.stdout)
+    stdin.write(f"{sim_cmd}\n")
+    stdin.flush()
+    if stdout.readline() != "done\n":
+        raise subprocess.CalledProcessError(server.wait(), [*server.args, sim_cmd])
 
 
 def exec_sim_run(sim_run: SimRun):
@@ -89,28 +162,32 @@ def exec_sim_run(sim_run: SimRun):
 
         run_dir = sim_run.run_dir
         with open(run_dir / ".lock", "w") as lock_file:
-            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            run_dir_entry_names = {entry.name for entry in os.scandir(run_dir)}
 
-            analyze = False
+            sim_cmds: list[tuple[str, str]] = []
 
-            if not (run_dir / "checkpoint.msgpack").exists():
-                print_process_msg(f"creating run {run_idx}")
-                exec_bin(sim_run, "create")
-                analyze = True
+            if "checkpoint.msgpack" not in run_dir_entry_names:
+                sim_cmds.append(("create", f"creating run {run_idx}"))
 
-            curr_n_files = len(list(run_dir.glob("output-*")))
-            while curr_n_files < n_files:
-                print_process_msg(f"resuming run {run_idx} ({curr_n_files})")
-                exec_bin(sim_run, "resume")
-                curr_n_files += 1
-                analyze = True
+            curr_n_files = sum(
+                name.startswith("output-") for name in run_dir_entry_names
+            )
+            for file_idx in range(curr_n_files, n_files):
+                sim_cmds.append(("resume", f"resuming run {run_idx} ({file_idx})"))
 
-            if not (run_dir / "analysis.msgpack").exists():
-                analyze = True
+            if sim_cmds or "analysis.msgpack" not in run_dir_entry_names:
+                sim_cmds.append(("analyze", f"analyzing run {run_idx}"))
 
-            if analyze:
-                print_process_msg(f"analyzing run {run_idx}")
-                exec_bin(sim_run, "analyze")
+            if sim_cmds:
+                with (
+                    open(run_dir / "output.log", "w") as output_file,
+                    start_bin(sim_run, output_file) as server,
+                ):
+                    for sim_cmd, message in sim_cmds:
+                        print_process_msg(message)
+                        exec_bin(server, sim_cmd)
 
         print_process_msg(f"run {run_idx} finished")
         return RunResult.FINISHED
@@ -124,19 +201,17 @@ def exec_sim_run(sim_run: SimRun):
         return RunResult.FAILED
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SimJob:
     base_dir: Path
     config: Config
     n_runs: int
     n_files: int
+    sim_dir: Path = field(init=False)
 
     def __post_init__(self):
-        self.config = deepcopy(self.config)
-
-    @property
-    def sim_dir(self) -> Path:
-        return hash_sim_dir(self.base_dir, self.config)
+        sim_dir = hash_sim_dir(self.base_dir, self.config)
+        object.__setattr__(self, "sim_dir", sim_dir)
 
 
 @dataclass
@@ -150,78 +225,92 @@ class SimsConfig:
 
 def create_sim_jobs(sims_config: SimsConfig) -> list[SimJob]:
     init_sim_job = sims_config.init_sim_job
+    init_config = sims_config.init_sim_job.config
     base_dir = sims_config.init_sim_job.base_dir
     n_runs = sims_config.init_sim_job.n_runs
     n_files = sims_config.init_sim_job.n_files
 
     sim_jobs = [init_sim_job]
 
-    if init_sim_job.config["model"]["n_phe"] == 2:
+    if init_config.model.n_phe == 2:
         for strat_phe_0_i in sims_config.strat_phe_0_i_values:
-            config = deepcopy(init_sim_job.config)
             strat_phe_i = [strat_phe_0_i, 1 - strat_phe_0_i]
-            config["init"]["strat_phe"] = strat_phe_i
+            config = replace(
+                init_config, init=replace(init_config.init, strat_phe=strat_phe_i)
+            )
             sim_jobs.append(SimJob(base_dir, config, n_runs, n_files))
-            config["model"]["prob_mut"] = 0.0
+            config = replace(config, model=replace(config.model, prob_mut=0.0))
             sim_jobs.append(SimJob(base_dir, config, n_runs, n_files))
             for n_agents_i in sims_config.fixed_n_agents_i_values:
-                if n_agents_i == init_sim_job.config["init"]["n_agents"]:
+                if n_agents_i == init_config.init.n_agents:
                     continue
-                config["init"]["n_agents"] = n_agents_i
+                config = replace(config, init=replace(config.init, n_agents=n_agents_i))
                 sim_jobs.append(SimJob(base_dir, config, n_runs, n_files))
 
-    prob_mut_values = set(sims_config.prob_mut_values) | {
-        init_sim_job.config["model"]["prob_mut"]
-    }
-    n_agents_i_values = set(sims_config.n_agents_i_values) | {
-        init_sim_job.config["init"]["n_agents"]
-    }
+    prob_mut_values = set(sims_config.prob_mut_values) | {init_config.model.prob_mut}
+    n_agents_i_values = set(sims_config.n_agents_i_values) | {init_config.init.n_agents}
     for prob_mut in prob_mut_values:
         for n_agents_i in n_agents_i_values:
             if (
-                n_agents_i == init_sim_job.config["init"]["n_agents"]
-                and prob_mut == init_sim_job.config["model"]["prob_mut"]
+                n_agents_i == init_config.init.n_agents
+                and prob_mut == init_config.model.prob_mut
             ):
                 continue
-            config = deepcopy(init_sim_job.config)
-            config["model"]["prob_mut"] = prob_mut
-            config["init"]["n_agents"] = n_agents_i
+            config = replace(
+                init_config,
+                model=replace(init_config.model, prob_mut=prob_mut),
+                init=replace(init_config.init, n_agents=n_agents_i),
+            )
             sim_jobs.append(SimJob(base_dir, config, n_runs, n_files))
 
-    return sim_jobs
+    unique_sim_jobs = {sim_job.sim_dir: sim_job for sim_job in sim_jobs}
+    return list(unique_sim_jobs.values())
 
 
-def exec_sim_job(sim_job: SimJob) -> None:
-    print_process_msg(f"starting job ({sim_job.sim_dir.name})")
+def sim_job_cost(sim_job: SimJob) -> int:
+    return sim_job.config.init.n_agents * sim_job.n_files
 
-    print_process_msg("starting process pool")
+
+def exec_sim_jobs(sim_jobs: list[SimJob]) -> None:
+    set_signal_handler()
+
+    build_bin()
+
+    print_process_msg("starting jobs")
 
     sim_runs = [
         SimRun(sim_job.sim_dir, run_idx, sim_job.n_files)
+        for sim_job in sorted(sim_jobs, key=sim_job_cost, reverse=True)
         for run_idx in range(sim_job.n_runs)
     ]
-    with mp.Pool(processes=N_CORES) as pool:
-        run_results = pool.map(exec_sim_run, sim_runs)
+
+    print_process_msg("starting process pool")
+
+    run_failed = False
+    run_paused = False
+    with MP_CONTEXT.Pool(
+        processes=N_CORES,
+        initializer=init_worker,
+        initargs=(pause_event, MP_CONTEXT.Value("i", 0), physical_core_cpus()),
+    ) as pool:
+        for run_result in pool.imap_unordered(exec_sim_run, sim_runs, chunksize=1):
+            if run_result == RunResult.FAILED and not run_failed:
+                print_process_msg("run failed: pausing remaining runs")
+                run_failed = True
+                if pause_event is not None:
+                    pause_event.set()
+
+            if run_result == RunResult.PAUSED:
+                run_paused = True
 
     print_process_msg("process pool finished")
 
-    if run_results.count(RunResult.FAILED) > 0:
+    if run_failed:
+        if pause_event is not None:
+            pause_event.clear()
         raise RuntimeError("some run failed")
 
-    if run_results.count(RunResult.PAUSED) > 0:
+    if run_paused:
         raise RuntimeError("some run was paused")
 
-    print_process_msg(f"job ({sim_job.sim_dir.name}) finished")
-
-
-def exec_sim_jobs(sim_jobs: list[SimJob]) -> None:
-    set_signal_handler()
-
-    build_bin()
-
-    print_process_msg("starting jobs")
-
-    for sim_job in sim_jobs:
-        exec_sim_job(sim_job)
-
     print_process_msg("jobs finished")
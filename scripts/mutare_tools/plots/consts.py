@@ -1,3 +1,5 @@
+import os
+from functools import cache
 from typing import Any
 
 import matplotlib as mpl
@@ -6,21 +8,34 @@ import pandas as pd
 from ..analysis import SimType
 from ..exec import SimJob
 
-mpl.use("pdf")
 
-mpl.rcParams["text.usetex"] = True
-mpl.rcParams["text.latex.preamble"] = "\\usepackage{lmodern}\\usepackage{mathtools}"
-mpl.rcParams["font.family"] = "lmodern"
-mpl.rcParams["font.size"] = 10
-mpl.rcParams["figure.dpi"] = 1200
-mpl.rcParams["figure.constrained_layout.use"] = True
+@cache
+def setup_matplotlib() -> None:
+    mpl.use("pdf")
+
+    if os.environ.get("MUTARE_TEX"):
+        mpl.rcParams["text.usetex"] = True
+        mpl.rcParams["text.latex.preamble"] = (
+            "\\usepackage{lmodern}\\usepackage{mathtools}"
+        )
+        mpl.rcParams["font.family"] = "lmodern"
+    else:
+        mpl.rcParams["font.family"] = "serif"
+        mpl.rcParams["font.serif"] = ["cmr10"]
+        mpl.rcParams["mathtext.fontset"] = "cm"
+        mpl.rcParams["axes.formatter.use_mathtext"] = True
+    mpl.rcParams["font.size"] = 10
+    mpl.rcParams["figure.dpi"] = 1200
+    mpl.rcParams["savefig.dpi"] = 300
+    mpl.rcParams["figure.constrained_layout.use"] = True
+
 
 CM = 1 / 2.54
 FIGSIZE = (8.0 * CM, 4.94 * CM)
 
 PLOT_STYLE: dict[str, Any] = {"ls": "--", "marker": "o", "markersize": 2}
 FILL_STYLE: dict[str, Any] = {"lw": 0.0, "alpha": 0.5}
-LINE_STYLE: dict[str, Any] = {"c": "k", "lw": 1.0, "alpha": 0.5}
+LINE_STYLE: dict[str, Any] = {"color": "k", "lw": 1.0, "alpha": 0.5}
 
 COLORS = {
     "blue": "#4e79a7",
@@ -43,9 +58,9 @@ SIM_COLORS: dict[SimType, Any] = {
     SimType.RANDOM: COLORS["green"],
 }
 SIM_LABELS: dict[SimType, str] = {
-    SimType.FIXED: "\\texttt{fixed}",
-    SimType.EVOL: "\\texttt{evol}",
-    SimType.RANDOM: "\\texttt{evol(r)}",
+    SimType.FIXED: "$\\mathtt{fixed}$",
+    SimType.EVOL: "$\\mathtt{evol}$",
+    SimType.RANDOM: "$\\mathtt{evol(r)}$",
 }
 
 COL_TEX_LABELS: dict[str, str] = {
@@ -77,22 +92,22 @@ N_EVALS = 64
 
 def strat_phe_0_i_filter(df: pd.DataFrame, job: SimJob) -> pd.DataFrame:
     return df[
-        ((df["prob_mut"] == job.config["model"]["prob_mut"]) | (df["prob_mut"] == 0))
-        & (df["n_agents_i"] == job.config["init"]["n_agents"])
+        ((df["prob_mut"] == job.config.model.prob_mut) | (df["prob_mut"] == 0))
+        & (df["n_agents_i"] == job.config.init.n_agents)
     ]
 
 
 def prob_mut_filter(df: pd.DataFrame, job: SimJob) -> pd.DataFrame:
     return df[
         (df["sim_type"] == SimType.RANDOM)
-        & (df["n_agents_i"] == job.config["init"]["n_agents"])
+        & (df["n_agents_i"] == job.config.init.n_agents)
     ]
 
 
 def n_agents_i_filter(df: pd.DataFrame, job: SimJob) -> pd.DataFrame:
     return df[
         (df["sim_type"] == SimType.RANDOM)
-        & (df["prob_mut"] == job.config["model"]["prob_mut"])
+        & (df["prob_mut"] == job.config.model.prob_mut)
     ]
 
 
@@ -107,7 +122,7 @@ def fixed_filter(df: pd.DataFrame, job: SimJob) -> pd.DataFrame:
 def fixed_i_filter(df: pd.DataFrame, job: SimJob) -> pd.DataFrame:
     return df[
         (df["sim_type"] == SimType.FIXED)
-        & (df["n_agents_i"] == job.config["init"]["n_agents"])
+        & (df["n_agents_i"] == job.config.init.n_agents)
     ]
 
 
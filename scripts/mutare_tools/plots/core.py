@@ -8,6 +8,7 @@ from matplotlib.axes import Axes
 
 from ..analysis import SimType, collect_avg_analyses, collect_run_time_series
 from ..exec import N_CORES, SimJob, print_process_msg
+from .consts import setup_matplotlib
 from .utils import (
     FILTERS,
     LINE_STYLE,
@@ -37,10 +38,15 @@ from .utils import (
 
 
 def make_param_plots(param: str, df: pd.DataFrame, job: SimJob) -> None:
+    setup_matplotlib()
+
     param_df = FILTERS[param](df, job).sort_values(param)
     if len(param_df) < 2:
         return
 
+    fig_dir = job.base_dir / "plots" / param
+    fig_dir.mkdir(parents=True, exist_ok=True)
+
     two_panels = param == "strat_phe_0_i"
     fig_0, ax_0 = create_standard_figure(param, "avg_growth_rate")
     fig_1, ax_1 = create_standard_figure(param, "extinct_rate")
@@ -137,13 +143,27 @@ def make_param_plots(param: str, df: pd.DataFrame, job: SimJob) -> None:
 
     max_avg_growth = get_optimal_strat_phe_0(df, job, "avg_growth_rate", "max")
     min_extinct = get_optimal_strat_phe_0(df, job, "extinct_rate", "min")
+    optimal_strat_phe_0 = [max_avg_growth, min_extinct]
+    optimal_ls = ["--", ":"]
     if param == "strat_phe_0_i":
         for ax in [ax_0, ax_1]:
-            ax.axvline(max_avg_growth, ls="--", **LINE_STYLE)
-            ax.axvline(min_extinct, ls=":", **LINE_STYLE)
+            ax.vlines(
+                optimal_strat_phe_0,
+                0,
+                1,
+                transform=ax.get_xaxis_transform(),
+                linestyles=optimal_ls,
+                **LINE_STYLE,
+            )
     for ax in axs_4[:-1] + [ax_5]:
-        ax.axhline(max_avg_growth, ls="--", **LINE_STYLE)
-        ax.axhline(min_extinct, ls=":", **LINE_STYLE)
+        ax.hlines(
+            optimal_strat_phe_0,
+            0,
+            1,
+            transform=ax.get_yaxis_transform(),
+            linestyles=optimal_ls,
+            **LINE_STYLE,
+        )
 
     if param in ["prob_mut", "n_agents_i"]:
         for ax in [ax_0, ax_1, ax_5, ax_6, ax_7, ax_8]:
@@ -158,9 +178,6 @@ def make_param_plots(param: str, df: pd.DataFrame, job: SimJob) -> None:
         )
         ax.legend(handles, labels)
 
-    fig_dir = job.base_dir / "plots" / param
-    fig_dir.mkdir(parents=True, exist_ok=True)
-
     fig_0.savefig(fig_dir / "avg_growth_rate.pdf")
     fig_1.savefig(fig_dir / "extinct_rate.pdf")
     fig_2.savefig(fig_dir / "rates.pdf")
@@ -177,6 +194,8 @@ def make_param_plots(param: str, df: pd.DataFrame, job: SimJob) -> None:
 
 
 def make_time_series_plots(df: pd.DataFrame, job: SimJob) -> None:
+    setup_matplotlib()
+
     fig_dir = job.base_dir / "plots" / "time_series"
     fig_dir.mkdir(parents=True, exist_ok=True)
 
@@ -193,10 +212,15 @@ def make_time_series_plots(df: pd.DataFrame, job: SimJob) -> None:
 
 
 def make_fixed_plots(df: pd.DataFrame, job: SimJob) -> None:
+    setup_matplotlib()
+
     fixed_df = FILTERS["fixed"](df, job).sort_values("strat_phe_0_i")
     if fixed_df["n_agents_i"].nunique() <= 4:
         return
 
+    fig_dir = job.base_dir / "plots" / "fixed"
+    fig_dir.mkdir(parents=True, exist_ok=True)
+
     fig_0, axs_0 = create_colorbar_figure("strat_phe_0_i", "avg_growth_rate", False)
     fig_1, axs_1 = create_colorbar_figure("strat_phe_0_i", "extinct_rate", False)
     fig_2, axs_2 = create_colorbar_figure("strat_phe_0_i", "avg_dist_phe_0", False)
@@ -295,11 +319,10 @@ def make_fixed_plots(df: pd.DataFrame, job: SimJob) -> None:
             avg_s_exp_row.append((s_exp * p_s_exp / len(s_exp)).sum())
 
             s, p_s = get_dist_avg_strat_phe_0(subgroup_df)
-            s = np.array(s)
-            p_s = np.array(p_s).ravel()
+            p_s = p_s.ravel()
             avg_s_row.append((s * p_s / len(s)).sum())
 
-            if prob_mut == job.config["model"]["prob_mut"]:
+            if prob_mut == job.config.model.prob_mut:
                 plot_colored_curve(axs_6[0], s_exp, p_s_exp, log_norm, value)
                 plot_colored_curve(axs_7[0], s, p_s, log_norm, value)
 
@@ -314,9 +337,6 @@ def make_fixed_plots(df: pd.DataFrame, job: SimJob) -> None:
     image = plot_avg_avg_strat_phe_0(axs_9[0], random_df, np.array(avg_s))
     set_colorbar(fig_9, axs_9[1], "avg_avg_strat_phe_0", image)
 
-    fig_dir = job.base_dir / "plots" / "fixed"
-    fig_dir.mkdir(parents=True, exist_ok=True)
-
     fig_0.savefig(fig_dir / "avg_growth_rate.pdf")
     fig_1.savefig(fig_dir / "extinct_rate.pdf")
     fig_2.savefig(fig_dir / "avg_dist_phe_0.pdf")
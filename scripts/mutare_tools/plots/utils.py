@@ -1,9 +1,11 @@
-from typing import Any, Literal, cast
+from functools import cache
+from typing import Literal, cast
 
 import numpy as np
 import pandas as pd
 from matplotlib.axes import Axes
 from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PolyCollection
 from matplotlib.colors import LogNorm, Normalize, PowerNorm
 from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
@@ -78,20 +80,35 @@ def plot_horizontal_bands(
     ax: Axes, df: pd.DataFrame, mean_col: tuple[str, str], span_col: tuple[str, str]
 ) -> None:
     color, label = get_sim_color_and_label(df)
-    for mean, span in df[[mean_col, span_col]].itertuples(index=False):
-        ax.axhline(mean, c=color, label=label, ls=PLOT_STYLE["ls"])
-        ax.axhspan(mean + span, mean - span, color=color, **FILL_STYLE)
-        label = None
+    mean = df[mean_col].to_numpy()
+    span = df[span_col].to_numpy()
+    transform = ax.get_yaxis_transform()
+    ax.hlines(
+        mean,
+        0,
+        1,
+        colors=color,
+        linestyles=PLOT_STYLE["ls"],
+        label=label,
+        transform=transform,
+    )
+    bands = [
+        [(0, lower), (1, lower), (1, upper), (0, upper)]
+        for lower, upper in zip(mean - span, mean + span)
+    ]
+    ax.add_collection(
+        PolyCollection(bands, color=color, transform=transform, **FILL_STYLE)
+    )
 
 
 def plot_errorbar(
     ax: Axes, df: pd.DataFrame, x_col: str, y_col: str, use_xerr: bool
 ) -> None:
     color, label = get_sim_color_and_label(df)
-    x = df[(x_col, "mean")] if use_xerr else df[x_col]
-    y = df[(y_col, "mean")]
-    xerr = df[(x_col, "sem")] if use_xerr else None
-    yerr = df[(y_col, "sem")]
+    x = (df[(x_col, "mean")] if use_xerr else df[x_col]).to_numpy()
+    y = df[(y_col, "mean")].to_numpy()
+    xerr = df[(x_col, "sem")].to_numpy() if use_xerr else None
+    yerr = df[(y_col, "sem")].to_numpy()
     ax.errorbar(x, y, yerr, xerr, c=color, label=label, **PLOT_STYLE)
 
 
@@ -99,26 +116,31 @@ def plot_errorband(
     ax: Axes, df: pd.DataFrame, x_col: str, y_col: str, y_span_col: str
 ) -> None:
     color, _ = get_sim_color_and_label(df)
-    x = df[x_col]
-    y = df[(y_col, "mean")]
-    y_span = df[(y_span_col, "mean")]
+    x = df[x_col].to_numpy()
+    y = df[(y_col, "mean")].to_numpy()
+    y_span = df[(y_span_col, "mean")].to_numpy()
     ax.fill_between(x, y - y_span, y + y_span, color=color, **FILL_STYLE)
 
 
 def count_hist_bins(df: pd.DataFrame, y_col: str) -> int:
+    if "hist_bins" in df.attrs:
+        return df.attrs["hist_bins"]
     hist_bins = 0
     while (f"{y_col}_{hist_bins}", "mean") in df.columns:
         hist_bins += 1
     return hist_bins
 
 
-def generate_heatmap_matrix(
-    df: pd.DataFrame, z_col: str, hist_bins: int
-) -> list[list[float]]:
-    hm_z = []
-    for bin in range(hist_bins):
-        hm_z.append((hist_bins * df[(f"{z_col}_{bin}", "mean")]).tolist())
-    return hm_z
+@cache
+def get_hist_bin_centers(hist_bins: int) -> np.ndarray:
+    bin_centers = (np.arange(hist_bins) + 1 / 2) / hist_bins
+    bin_centers.flags.writeable = False
+    return bin_centers
+
+
+def generate_heatmap_matrix(df: pd.DataFrame, z_col: str, hist_bins: int) -> np.ndarray:
+    z_cols = [(f"{z_col}_{bin}", "mean") for bin in range(hist_bins)]
+    return hist_bins * df[z_cols].to_numpy().T
 
 
 def get_norm(
@@ -147,11 +169,11 @@ def plot_main_heatmap(
     _, label = get_sim_color_and_label(df)
     add_top_label(ax_main, label)
     hist_bins = count_hist_bins(df, z_col)
-    hm_x = df[x_col].tolist()
-    hm_y = [(i + 0.5) / hist_bins for i in range(hist_bins)]
+    hm_x = df[x_col].to_numpy()
+    hm_y = get_hist_bin_centers(hist_bins)
     hm_z = generate_heatmap_matrix(df, z_col, hist_bins)
     norm = get_norm("power", 0, hist_bins)
-    image = ax_main.pcolormesh(hm_x, hm_y, hm_z, norm=norm, cmap=CMAP)
+    image = ax_main.pcolormesh(hm_x, hm_y, hm_z, norm=norm, cmap=CMAP, rasterized=True)
     ax_main.set_xlim(hm_x[0], hm_x[-1])
     set_colorbar(fig, ax_bar, z_col, image)
 
@@ -160,11 +182,17 @@ def plot_side_heatmap(ax_side: Axes, df: pd.DataFrame, z_col: str) -> None:
     _, label = get_sim_color_and_label(df)
     add_top_label(ax_side, label)
     hist_bins = count_hist_bins(df, z_col)
-    hm_x = [0.0, 1.0]
-    hm_y = [i / hist_bins for i in range(hist_bins + 1)]
     hm_z = generate_heatmap_matrix(df, z_col, hist_bins)
     norm = get_norm("power", 0, hist_bins)
-    ax_side.pcolormesh(hm_x, hm_y, hm_z, norm=norm, cmap=CMAP)
+    ax_side.imshow(
+        hm_z,
+        norm=norm,
+        cmap=CMAP,
+        aspect="auto",
+        interpolation="nearest",
+        origin="lower",
+        extent=(0.0, 1.0, 0.0, 1.0),
+    )
 
 
 def create_1D_spline(df: pd.DataFrame, x_col: str, y_col: str) -> BSpline:
@@ -204,16 +232,16 @@ def get_optimal_strat_phe_0(
 
 
 def plot_dist_phe_0_lims(ax: Axes, df: pd.DataFrame, job: SimJob) -> None:
-    n_env = job.config["model"]["n_env"]
-    n_phe = job.config["model"]["n_phe"]
+    n_env = job.config.model.n_env
+    n_phe = job.config.model.n_phe
     if n_env != 2 or n_phe != 2:
         return
 
     strat_phe_0_i_values = df["strat_phe_0_i"].dropna().unique().tolist()
 
     for env in range(n_env):
-        rates_birth = np.array(job.config["model"]["rates_birth"][env])
-        rates_death = np.array(job.config["model"]["rates_death"][env])
+        rates_birth = np.array(job.config.model.rates_birth[env])
+        rates_death = np.array(job.config.model.rates_death[env])
         dist_phe_0_lim_values = []
         for strat_phe_0_i in strat_phe_0_i_values:
             strat_phe_1_i = 1.0 - strat_phe_0_i
@@ -232,12 +260,10 @@ def plot_dist_phe_0_lims(ax: Axes, df: pd.DataFrame, job: SimJob) -> None:
         ax.plot(strat_phe_0_i_values, dist_phe_0_lim_values, ls="--", **LINE_STYLE)
 
 
-def get_dist_avg_strat_phe_0(df: pd.DataFrame) -> tuple[list[Any], list[Any]]:
+def get_dist_avg_strat_phe_0(df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
     hist_bins = count_hist_bins(df, "dist_avg_strat_phe_0")
-    s, p_s = [], []
-    for bin in range(hist_bins):
-        s.append((bin + 1 / 2) / hist_bins)
-        p_s.append(hist_bins * df[(f"dist_avg_strat_phe_0_{bin}", "mean")])
+    s = get_hist_bin_centers(hist_bins)
+    p_s = generate_heatmap_matrix(df, "dist_avg_strat_phe_0", hist_bins)
     return s, p_s
 
 
@@ -262,9 +288,17 @@ def plot_expected_values(
 
 
 def plot_extinct_times(ax: Axes, df: pd.DataFrame) -> None:
-    extinct_times = df["time"][df["n_extinct"].diff() > 0]
-    for extinct_time in extinct_times:
-        ax.axvline(extinct_time, ls=":", c="k", lw=0.25, alpha=0.5)
+    extinct_times = df["time"][df["n_extinct"].diff() > 0].to_numpy()
+    ax.vlines(
+        extinct_times,
+        0,
+        1,
+        transform=ax.get_xaxis_transform(),
+        colors="k",
+        linestyles=":",
+        lw=0.25,
+        alpha=0.5,
+    )
 
 
 def plot_time_series(
@@ -342,7 +376,13 @@ def plot_avg_avg_strat_phe_0(
     n_agents_i = sorted(df["n_agents_i"].unique())
     prob_mut = sorted(df["prob_mut"].unique())
     image = ax_main.pcolormesh(
-        n_agents_i, prob_mut, avg_s.transpose(), vmin=0, vmax=1, cmap=CMAP
+        n_agents_i,
+        prob_mut,
+        avg_s.transpose(),
+        vmin=0,
+        vmax=1,
+        cmap=CMAP,
+        rasterized=True,
     )
     ax_main.set_xlim(n_agents_i[0], n_agents_i[-1])
     ax_main.set_ylim(prob_mut[0], prob_mut[-1])
@@ -1,12 +1,47 @@
-from copy import deepcopy
+from dataclasses import replace
 from pathlib import Path
 
 import numpy as np
+from mutare_tools.config import Config, InitParams, ModelParams, OutputParams
 from mutare_tools.exec import SimJob, SimsConfig
 
 SIMS_DIR = Path(__file__).resolve().parents[1] / "sims"
 
 
+def _make_sim_job(
+    base_dir: Path,
+    rates_birth: list[list[float]],
+    rates_death: list[list[float]],
+    prob_mut: float,
+    std_dev_mut: float | None = None,
+) -> SimJob:
+    return SimJob(
+        base_dir=base_dir,
+        config=Config(
+            model=ModelParams(
+                n_env=2,
+                n_phe=2,
+                rates_trans=[
+                    [-1.0, 1.0],
+                    [1.0, -1.0],
+                ],
+                rates_birth=rates_birth,
+                rates_death=rates_death,
+                prob_mut=prob_mut,
+                std_dev_mut=std_dev_mut,
+            ),
+            init=InitParams(n_agents=100),
+            output=OutputParams(
+                file_steps_factor=16_384,
+                save_steps_factor=4,
+                hist_bins=64,
+            ),
+        ),
+        n_runs=16,
+        n_files=64,
+    )
+
+
 def _generate_sims_configs() -> list[SimsConfig]:
 
     strat_phe_0_i_values = (
@@ -20,35 +55,17 @@ def _generate_sims_configs() -> list[SimsConfig]:
         np.logspace(start=1.5, stop=2.5, num=5).round(0).astype(int).tolist()
     )
 
-    symmetric_sim_job = SimJob(
+    symmetric_sim_job = _make_sim_job(
         base_dir=SIMS_DIR / "symmetric",
-        config={
-            "model": {
-                "n_env": 2,
-                "n_phe": 2,
-                "rates_trans": [
-                    [-1.0, 1.0],
-                    [1.0, -1.0],
-                ],
-                "rates_birth": [
-                    [1.2, 0.0],
-                    [0.0, 0.8],
-                ],
-                "rates_death": [
-                    [0.0, 1.0],
-                    [1.0, 0.0],
-                ],
-                "prob_mut": 0.001,
-            },
-            "init": {"n_agents": 100},
-            "output": {
-                "file_steps_factor": 16_384,
-                "save_steps_factor": 4,
-                "hist_bins": 64,
-            },
-        },
-        n_runs=16,
-        n_files=64,
+        rates_birth=[
+            [1.2, 0.0],
+            [0.0, 0.8],
+        ],
+        rates_death=[
+            [0.0, 1.0],
+            [1.0, 0.0],
+        ],
+        prob_mut=0.001,
     )
 
     symmetric_sims_config = SimsConfig(
@@ -59,16 +76,18 @@ def _generate_sims_configs() -> list[SimsConfig]:
         fixed_n_agents_i_values=fixed_n_agents_i_values,
     )
 
-    asymmetric_sim_job = deepcopy(symmetric_sim_job)
-    asymmetric_sim_job.base_dir = SIMS_DIR / "asymmetric"
-    asymmetric_sim_job.config["model"]["rates_birth"] = [
-        [1.0, 0.2],
-        [0.0, 0.0],
-    ]
-    asymmetric_sim_job.config["model"]["rates_death"] = [
-        [0.0, 0.0],
-        [1.0, 0.1],
-    ]
+    asymmetric_sim_job = _make_sim_job(
+        base_dir=SIMS_DIR / "asymmetric",
+        rates_birth=[
+            [1.0, 0.2],
+            [0.0, 0.0],
+        ],
+        rates_death=[
+            [0.0, 0.0],
+            [1.0, 0.1],
+        ],
+        prob_mut=0.001,
+    )
 
     asymmetric_sims_config = SimsConfig(
         init_sim_job=asymmetric_sim_job,
@@ -78,10 +97,15 @@ def _generate_sims_configs() -> list[SimsConfig]:
         fixed_n_agents_i_values=fixed_n_agents_i_values,
     )
 
-    incremental_sim_job = deepcopy(asymmetric_sim_job)
-    incremental_sim_job.base_dir = SIMS_DIR / "incremental"
-    incremental_sim_job.config["model"]["prob_mut"] = 0.01
-    incremental_sim_job.config["model"]["std_dev_mut"] = 0.1
+    asymmetric_config = asymmetric_sim_job.config
+    incremental_sim_job = replace(
+        asymmetric_sim_job,
+        base_dir=SIMS_DIR / "incremental",
+        config=replace(
+            asymmetric_config,
+            model=replace(asymmetric_config.model, prob_mut=0.01, std_dev_mut=0.1),
+        ),
+    )
 
     incremental_sims_config = SimsConfig(
         init_sim_job=incremental_sim_job,
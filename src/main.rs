@@ -7,9 +7,12 @@ mod manager;
 mod types;
 
 use crate::manager::Manager;
-use anyhow::{Context, Result};
+use anyhow::{Context, Result, bail};
 use clap::{Parser, Subcommand};
-use std::path::PathBuf;
+use std::{
+    io::{self, BufRead, Write},
+    path::PathBuf,
+};
 
 /// Command-line interface for managing, producing and analyzing simulations.
 #[derive(Debug, Parser)]
@@ -39,6 +42,21 @@ enum SimCmd {
 
     /// Analyze simulation run.
     Analyze,
+
+    /// Serve simulation commands read from standard input.
+    ///
+    /// Each line must hold one of the other simulation commands and is acknowledged
+    /// by writing `done` to standard output once it has been executed.
+    Serve,
+}
+
+/// Simulation command read by the server.
+#[derive(Debug, Parser)]
+#[command(no_binary_name = true)]
+struct ServedCmd {
+    /// Simulation command.
+    #[command(subcommand)]
+    sim_cmd: SimCmd,
 }
 
 /// Entry point of the application.
@@ -66,11 +84,44 @@ fn run_cli() -> Result<()> {
     // Create a manager for the specified simulation directory.
     let mgr = Manager::new(cli.sim_dir).context("failed to create mgr")?;
 
-    // Execute the requested simulation command.
+    // Execute the requested simulation command or serve them from standard input.
     match cli.sim_cmd {
-        SimCmd::Create => mgr.create_run(cli.run_idx)?,
-        SimCmd::Resume => mgr.resume_run(cli.run_idx)?,
-        SimCmd::Analyze => mgr.analyze_run(cli.run_idx)?,
+        SimCmd::Serve => serve(&mgr, cli.run_idx)?,
+        sim_cmd => exec_sim_cmd(&mgr, cli.run_idx, sim_cmd)?,
+    }
+
+    Ok(())
+}
+
+/// Execute a single simulation command.
+fn exec_sim_cmd(mgr: &Manager, run_idx: usize, sim_cmd: SimCmd) -> Result<()> {
+    match sim_cmd {
+        SimCmd::Create => mgr.create_run(run_idx)?,
+        SimCmd::Resume => mgr.resume_run(run_idx)?,
+        SimCmd::Analyze => mgr.analyze_run(run_idx)?,
+        SimCmd::Serve => bail!("cannot serve from within a server"),
+    }
+
+    Ok(())
+}
+
+/// Execute simulation commands read from standard input until it is closed.
+fn serve(mgr: &Manager, run_idx: usize) -> Result<()> {
+    let mut stdout = io::stdout().lock();
+
+    for line in io::stdin().lock().lines() {
+        let line = line.context("failed to read command")?;
+
+        // Parse the command with the same syntax as the command-line interface.
+        let served_cmd = ServedCmd::try_parse_from(line.split_whitespace())
+            .with_context(|| format!("failed to parse command {line:?}"))?;
+        log::info!("{served_cmd:#?}");
+
+        exec_sim_cmd(mgr, run_idx, served_cmd.sim_cmd)?;
+
+        // Acknowledge the command so that the client can send the next one.
+        writeln!(stdout, "done").context("failed to acknowledge command")?;
+        stdout.flush().context("failed to flush stdout")?;
     }
 
     Ok(())
@@ -1,8 +1,12 @@
-use std::{env, fs, path::PathBuf, process::Command};
+use std::{
+    env, fs,
+    io::{BufRead, BufReader, Write},
+    path::PathBuf,
+    process::{Command, Stdio},
+};
 
-#[test]
-fn basic_workflow() {
-    let test_dir = PathBuf::from(env!("CARGO_TARGET_TMPDIR")).join("basic_workflow");
+fn create_test_dir(name: &str) -> PathBuf {
+    let test_dir = PathBuf::from(env!("CARGO_TARGET_TMPDIR")).join(name);
 
     fs::remove_dir_all(&test_dir).ok();
     fs::create_dir(&test_dir).expect("failed to create test directory");
@@ -28,6 +32,13 @@ fn basic_workflow() {
 
     fs::write(&config_path, config_contents).expect("failed to write config file");
 
+    test_dir
+}
+
+#[test]
+fn basic_workflow() {
+    let test_dir = create_test_dir("basic_workflow");
+
     fn run_bin(args: &[&str]) {
         let bin = PathBuf::from(env!("CARGO_BIN_EXE_mutare"));
 
@@ -65,3 +76,46 @@ fn basic_workflow() {
 
     fs::remove_dir_all(&test_dir).ok();
 }
+
+#[test]
+fn serve_workflow() {
+    let test_dir = create_test_dir("serve_workflow");
+
+    let test_dir_str = test_dir
+        .to_str()
+        .expect("failed to convert test directory to string");
+
+    let bin = PathBuf::from(env!("CARGO_BIN_EXE_mutare"));
+
+    let mut server = Command::new(bin)
+        .args(["--sim-dir", test_dir_str, "--run-idx", "0", "serve"])
+        .stdin(Stdio::piped())
+        .stdout(Stdio::piped())
+        .spawn()
+        .expect("failed to spawn server");
+
+    let mut stdin = server.stdin.take().expect("failed to open server stdin");
+    let mut stdout = BufReader::new(server.stdout.take().expect("failed to open server stdout"));
+
+    for sim_cmd in ["create", "resume", "resume", "analyze"] {
+        writeln!(stdin, "{sim_cmd}").expect("failed to send command");
+
+        let mut ack = String::new();
+        stdout
+            .read_line(&mut ack)
+            .expect("failed to read acknowledgement");
+
+        assert_eq!(ack, "done\n", "failed to serve {sim_cmd:?}");
+    }
+
+    drop(stdin);
+
+    let status = server.wait().expect("failed to wait for server");
+    assert!(status.success(), "server exited with {status}");
+
+    let run_dir = test_dir.join("run-0000");
+    assert!(run_dir.join("output-0001.msgpack").exists());
+    assert!(run_dir.join("analysis.msgpack").exists());
+
+    fs::remove_dir_all(&test_dir).ok();
+}